@@ -1,7 +1,9 @@
 #  how to run e.g. python save_to_firestore_only.py --year 2024 --semester 201
 
-import json
 import argparse
+import sys
+from dataclasses import dataclass
+from technion_fetcher_full import EXAM_CATEGORY_NAMES, iter_courses_file
 from smart_fetcher_fixed import save_to_firestore_university_structure, NoCacheTechnionCourseFetcher
 
 # Argument parser
@@ -15,32 +17,52 @@ args = parser.parse_args()
 # Initialize fetcher (Firestore config required)
 fetcher = NoCacheTechnionCourseFetcher(firestore_config=args.firestore_config, verbose=True)
 
-# Load courses from the JSON file
 json_path = f"{args.output_dir}/courses_{args.year}_{args.semester}.json"
-with open(json_path, encoding="utf-8") as f:
-    courses = json.load(f)
 
-# If your JSON contains dicts, but the function expects objects with attributes,
-# you may need to convert dicts to objects or update the function to accept dicts.
+# The Firestore saver expects objects with CourseInfo-like attributes, so the
+# JSON dicts are converted into lightweight slotted course objects.
 
+# Exam keys written by TechnionCourseFetcher.get_course_data
+EXAM_KEYS = tuple(EXAM_CATEGORY_NAMES.values())
+
+@dataclass(slots=True)
 class CourseObj:
-    def __init__(self, d):
-        self.course_number = d["general"]["מספר מקצוע"]
-        self.name = d["general"].get("שם מקצוע")
-        self.syllabus = d["general"].get("סילבוס")
-        self.faculty = d["general"].get("פקולטה")
-        self.academic_level = d["general"].get("מסגרת לימודים")
-        self.points = d["general"].get("נקודות")
-        self.responsible = d["general"].get("אחראים")
-        self.notes = d["general"].get("הערות")
-        self.schedule = d.get("schedule", [])
-        self.prerequisites = d["general"].get("מקצועות קדם")
-        self.adjoining_courses = d["general"].get("מקצועות צמודים")
-        self.no_additional_credit = d["general"].get("מקצועות ללא זיכוי נוסף")
-        self.exams = {k: v for k, v in d["general"].items() if "מועד" in k or "בחינה" in k}
-
-# Convert dicts to CourseObj
-courses_obj = [CourseObj(c) for c in courses]
+    course_number: str
+    name: str
+    syllabus: str
+    faculty: str
+    academic_level: str
+    points: str
+    responsible: str
+    notes: str
+    schedule: list
+    prerequisites: str
+    adjoining_courses: str
+    no_additional_credit: str
+    exams: dict
+
+def course_from_dict(d):
+    """Build a CourseObj from a course dict as stored in the JSON file"""
+    general = d["general"]
+    get = general.get
+    return CourseObj(
+        course_number=sys.intern(general["מספר מקצוע"]),
+        name=get("שם מקצוע"),
+        syllabus=get("סילבוס"),
+        faculty=get("פקולטה"),
+        academic_level=get("מסגרת לימודים"),
+        points=get("נקודות"),
+        responsible=get("אחראים"),
+        notes=get("הערות"),
+        schedule=d.get("schedule", []),
+        prerequisites=get("מקצועות קדם"),
+        adjoining_courses=get("מקצועות צמודים"),
+        no_additional_credit=get("מקצועות ללא זיכוי נוסף"),
+        exams={k: general[k] for k in EXAM_KEYS if get(k)},
+    )
+
+# Stream courses from the JSON file, converting dicts to CourseObj on the fly
+courses_obj = (course_from_dict(c) for c in iter_courses_file(json_path))
 
 # Call the function with the new list
 save_to_firestore_university_structure(
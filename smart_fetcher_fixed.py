@@ -21,10 +21,10 @@
 import datetime
 import argparse
 import sys
-import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from technion_fetcher_full import TechnionCourseFetcher
+from technion_fetcher_full import FIRESTORE_PROGRESS_INTERVAL, GENERAL_FIELDS, FirestoreWriteTracker, SEMESTER_NAMES, SEMESTER_NAMES_HE, TechnionCourseFetcher, iter_courses_file
 
 class NoCacheTechnionCourseFetcher(TechnionCourseFetcher):
     """Technion Course Fetcher that always fetches from API (no caching)"""
@@ -32,9 +32,10 @@ class NoCacheTechnionCourseFetcher(TechnionCourseFetcher):
     def __init__(self, 
                  cache_dir=None,  # Ignore cache_dir
                  firestore_config=None,
-                 verbose=False):
+                 verbose=False,
+                 max_workers=8):
         """Initialize the course fetcher without caching"""
-        super().__init__(cache_dir=None, firestore_config=firestore_config, verbose=verbose)
+        super().__init__(cache_dir=None, firestore_config=firestore_config, verbose=verbose, max_workers=max_workers)
         # Force disable caching by setting cache_dir to None
         self.cache_dir = None
         if verbose:
@@ -46,40 +47,7 @@ class NoCacheTechnionCourseFetcher(TechnionCourseFetcher):
         if self.verbose:
             print(f"🌐 Fetching from API (no cache): {query[:50]}...")
         
-        url = "https://portalex.technion.ac.il/sap/opu/odata/sap/Z_CM_EV_CDIR_DATA_SRV/$batch?sap-client=700"
-        
-        data = f"""
---batch_1d12-afbf-e3c7
-Content-Type: application/http
-Content-Transfer-Encoding: binary
-
-GET {query} HTTP/1.1
-sap-cancel-on-close: true
-X-Requested-With: X
-sap-contextid-accept: header
-Accept: application/json
-Accept-Language: he
-DataServiceVersion: 2.0
-MaxDataServiceVersion: 2.0
-
-
---batch_1d12-afbf-e3c7--
-""".replace("\n", "\r\n")
-        
-        response = self.session.post(url, headers=self.headers, data=data, timeout=60)
-        
-        if response.status_code != 202:
-            raise RuntimeError(f"Bad status code: {response.status_code}")
-        
-        response_chunks = response.text.replace("\r\n", "\n").strip().split("\n\n")
-        if len(response_chunks) != 3:
-            raise RuntimeError(f"Invalid response format")
-        
-        json_str = response_chunks[2].split("\n", 1)[0]
-        result = json.loads(json_str)
-        
-        if not allow_empty and result == {"d": {"results": []}}:
-            raise RuntimeError("Empty response")
+        result = self._fetch_from_api(query, allow_empty)
         
         # NO CACHING - just return the result directly
         if self.verbose:
@@ -87,27 +55,19 @@ MaxDataServiceVersion: 2.0
         
         return result
 
+# Technion semester system (approximate), indexed by month - 1:
+# Winter (200): October - February
+# Spring (201): March - July
+# Summer (202): August - September
+MONTH_TO_SEMESTER = (200, 200, 201, 201, 201, 201, 201, 202, 202, 200, 200, 200)
+
 def get_current_semester():
     """Automatically determine current semester based on date"""
     now = datetime.datetime.now()
-    year = now.year
-    month = now.month
-    
-    # Technion semester system (approximate):
-    # Winter (200): October - February
-    # Spring (201): March - July  
-    # Summer (202): July - September
-    
-    if month >= 10 or month <= 2:
-        # Winter semester
-        semester_year = year if month >= 10 else year
-        return semester_year, 200
-    elif month >= 3 and month <= 7:
-        # Spring semester
-        return year, 201
-    else:
-        # Summer semester
-        return year, 202
+    semester = MONTH_TO_SEMESTER[now.month - 1]
+    # SAP years are academic years, starting with the winter semester in October
+    year = now.year if now.month >= 10 else now.year - 1
+    return year, semester
 
 def get_next_semester(year, semester):
     """Get the next semester"""
@@ -134,11 +94,7 @@ def setup_university_metadata(fetcher, university_id="Technion"):
             "website": "https://technion.ac.il",
             "established": 1912,
             "semester_system": "200/201/202",
-            "semester_names": {
-                "200": "חורף",
-                "201": "אביב", 
-                "202": "קיץ"
-            },
+            "semester_names": {str(code): name for code, name in SEMESTER_NAMES_HE.items()},
             "logo_url": "https://upload.wikimedia.org/wikipedia/en/thumb/8/81/Technion_Israel_Institute_of_Technology_logo.svg/1200px-Technion_Israel_Institute_of_Technology_logo.svg.png",
             "fetcher_config": {
                 "api_type": "sap",
@@ -172,88 +128,96 @@ def save_to_firestore_university_structure(fetcher, courses, university_id, year
     data_file = os.path.join(output_dir, f"courses_{year}_{semester}.json")
     if os.path.exists(data_file):
         try:
-            with open(data_file, encoding="utf-8") as f:
-                existing_data = json.load(f)
-            for item in existing_data:
-                course_num = item.get("general", {}).get("מספר מקצוע")
-                schedule = item.get("schedule", [])
-                if course_num:
-                    existing_schedules[course_num] = schedule
+            existing_schedules = {
+                course_num: item.get("schedule", [])
+                for item in iter_courses_file(data_file)
+                if (course_num := item.get("general", {}).get("מספר מקצוע"))
+            }
         except Exception as e:
             print(f"⚠️ Failed to load existing data file: {e}")
 
     collection_name = f"courses_{year}_{semester}"
     university_collection = fetcher.db.collection(university_id)
-    semester_name = {200: "חורף", 201: "אביב", 202: "קיץ"}[semester]
-    university_collection.document('metadata').set({
-        'last_updated': firestore.SERVER_TIMESTAMP,
-        'available_semesters': firestore.ArrayUnion([collection_name]),
-        f'semester_counts.{collection_name}': len(courses)
-    }, merge=True)
-    print(f"📝 Updating {university_id} metadata...")
+    semester_name = SEMESTER_NAMES_HE[semester]
     university_doc = university_collection.document('data')
     courses_ref = university_doc.collection(collection_name)
-    batch = fetcher.db.batch()
-    for i, course in enumerate(courses):
-        doc_ref = courses_ref.document(course.course_number)
-        # Ensure schedule is a list of dicts
-        schedule = course.schedule
-        if not isinstance(schedule, list):
-            schedule = list(schedule)
-        if schedule and isinstance(schedule[0], object) and not isinstance(schedule[0], dict):
-            schedule = [vars(item) if hasattr(item, '__dict__') else item for item in schedule]
-        # If schedule is empty, try to use existing
-        if (not schedule or len(schedule) == 0) and course.course_number in existing_schedules:
-            schedule = existing_schedules[course.course_number]
-            print(f"ℹ️ Used existing schedule for course {course.course_number}")
-        print(f"Saving course {course.course_number} schedule: {schedule}")
-        course_data = {
-            "general": {
-                "מספר מקצוע": course.course_number,
-                "שם מקצוע": course.name,
-                "סילבוס": course.syllabus,
-                "פקולטה": course.faculty,
-                "מסגרת לימודים": course.academic_level,
-                "נקודות": course.points,
-                "אחראים": course.responsible,
-                "הערות": course.notes,
-            },
-            "schedule": schedule,
-            "metadata": {
-                "fetched_at": firestore.SERVER_TIMESTAMP,
-                "university": university_id,
-                "year": year,
-                "semester": semester,
-                "semester_name": semester_name
+    write_tracker = FirestoreWriteTracker()
+    bulk_writer = fetcher.create_bulk_writer(write_tracker)
+    # Metadata is identical for all courses of the semester, so a single dict is shared
+    course_metadata = {
+        "fetched_at": firestore.SERVER_TIMESTAMP,
+        "university": university_id,
+        "year": year,
+        "semester": semester,
+        "semester_name": semester_name
+    }
+    # courses may be a generator (e.g. streamed from a JSON file), so count while writing
+    course_count = 0
+    try:
+        for course in courses:
+            course_count += 1
+            doc_ref = courses_ref.document(course.course_number)
+            # Schedules are lists of dicts, both from the fetcher and from JSON files
+            schedule = course.schedule
+            # If schedule is empty, try to use existing
+            if not schedule and course.course_number in existing_schedules:
+                schedule = existing_schedules[course.course_number]
+                if fetcher.verbose:
+                    print(f"ℹ️ Used existing schedule for course {course.course_number}")
+            # Leave out empty fields to keep documents small
+            general = {
+                key: value for key, attr in GENERAL_FIELDS
+                if (value := getattr(course, attr)) not in (None, "")
             }
-        }
-        
-        # Add optional fields
-        if course.prerequisites:
-            course_data["general"]["מקצועות קדם"] = course.prerequisites
-        if course.adjoining_courses:
-            course_data["general"]["מקצועות צמודים"] = course.adjoining_courses
-        if course.no_additional_credit:
-            course_data["general"]["מקצועות ללא זיכוי נוסף"] = course.no_additional_credit
-        
-        # Add exam information
-        for exam_type, exam_date in course.exams.items():
-            if exam_date:
-                course_data["general"][exam_type] = exam_date
-        
-        batch.set(doc_ref, course_data)
+            general.update((exam_type, exam_date) for exam_type, exam_date in course.exams.items() if exam_date)
+            course_data = {
+                "general": general,
+                "schedule": schedule,
+                "metadata": course_metadata
+            }
+            
+            bulk_writer.set(doc_ref, course_data)
+            
+            if course_count % FIRESTORE_PROGRESS_INTERVAL == 0:
+                print(f"📝 Queued {course_count} courses for {university_id}/data/{collection_name}")
         
-        # Commit in batches of 500 (Firestore limit)
-        if (i + 1) % 500 == 0:
-            batch.commit()
-            batch = fetcher.db.batch()
-            print(f"📝 Committed batch {(i + 1) // 500} to {university_id}/data/{collection_name}")
+        bulk_writer.flush()
+        # The bulk writer only reports failures to its callbacks, so raise for the caller here
+        write_tracker.check(course_count)
+    finally:
+        bulk_writer.close()
     
-    # Commit remaining documents
-    if len(courses) % 500 != 0:
-        batch.commit()
+    # Only list the semester once all its courses are stored, a failed update raises
+    print(f"📝 Updating {university_id} metadata...")
+    university_collection.document('metadata').set({
+        'last_updated': firestore.SERVER_TIMESTAMP,
+        'available_semesters': firestore.ArrayUnion([collection_name]),
+        f'semester_counts.{collection_name}': course_count
+    }, merge=True)
     
-    print(f"✅ Saved {len(courses)} courses to {university_id}/data/{collection_name}")
+    print(f"✅ Saved {course_count} courses to {university_id}/data/{collection_name}")
+
+def fetch_and_update_semester(fetcher, year, semester, output_dir):
+    """Fetch a semester's courses and save them to Firestore, returning the number of courses"""
+    semester_name = SEMESTER_NAMES[semester]
+    print(f"\n🔍 Fetching {semester_name} {year} ({year}-{semester}) - FRESH FROM API")
+    
+    # Fetch courses
+    courses = fetcher.fetch_semester_courses(
+        year=year,
+        semester=semester,
+        output_dir=output_dir
+    )
+    
+    if not courses:
+        print(f"⚠️ No courses found for {year}-{semester}")
+        return 0
+    
+    # Save to Firestore with university structure
+    save_to_firestore_university_structure(fetcher, courses, "Technion", year, semester)
+    
+    print(f"✅ Successfully updated {semester_name} {year}: {len(courses)} courses")
+    return len(courses)
 
 def main():
     parser = argparse.ArgumentParser(description="Smart Technion Course Fetcher (No Cache)")
@@ -264,6 +228,7 @@ def main():
     parser.add_argument("--force-year", type=int, help="Force specific year")
     parser.add_argument("--force-semester", type=int, help="Force specific semester")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+    parser.add_argument("--workers", type=int, default=8, help="Number of concurrent course requests")
     parser.add_argument("--no-cache", action="store_true", default=True, help="Disable caching (always enabled)")
     
     args = parser.parse_args()
@@ -275,7 +240,8 @@ def main():
     # Initialize fetcher with NO CACHE
     fetcher = NoCacheTechnionCourseFetcher(
         firestore_config=args.firestore_config,
-        verbose=args.verbose
+        verbose=args.verbose,
+        max_workers=args.workers
     )
     
     if not fetcher.db:
@@ -300,34 +266,21 @@ def main():
     successful_fetches = 0
     failed_fetches = 0
     
-    for year, semester in semesters_to_fetch:
-        semester_name = {200: "Winter", 201: "Spring", 202: "Summer"}[semester]
-        print(f"\n🔍 Fetching {semester_name} {year} ({year}-{semester}) - FRESH FROM API")
-        
-        try:
-            # Fetch courses
-            courses = fetcher.fetch_semester_courses(
-                year=year,
-                semester=semester,
-                output_dir=args.output_dir
-            )
-            
-            if not courses:
-                print(f"⚠️ No courses found for {year}-{semester}")
-                continue
-            
-            # Save to Firestore with university structure
-            save_to_firestore_university_structure(fetcher, courses, "Technion", year, semester)
-            
-            print(f"✅ Successfully updated {semester_name} {year}: {len(courses)} courses")
-            successful_fetches += 1
-            
-        except Exception as e:
-            print(f"❌ Failed to fetch {semester_name} {year}: {e}")
-            failed_fetches += 1
-            
-            # Don't exit on failure - try next semester
-            continue
+    # Fetch semesters concurrently, the fetcher bounds the total number of API requests in flight
+    with ThreadPoolExecutor(max_workers=len(semesters_to_fetch)) as executor:
+        futures = [
+            (year, semester, executor.submit(fetch_and_update_semester, fetcher, year, semester, args.output_dir))
+            for year, semester in semesters_to_fetch
+        ]
+        for year, semester, future in futures:
+            semester_name = SEMESTER_NAMES[semester]
+            try:
+                if future.result():
+                    successful_fetches += 1
+            except Exception as e:
+                print(f"❌ Failed to fetch {semester_name} {year}: {e}")
+                # Don't exit on failure - other semesters are still processed
+                failed_fetches += 1
     
     # Summary
     print(f"\n📊 Summary:")
@@ -18,26 +18,333 @@
 import json
 import time
 import re
+import sys
+import threading
 import urllib.parse
-import hashlib
-from datetime import datetime, timezone
+import queue
+import sqlite3
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 import requests
-from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dataclasses import dataclass, field
 import argparse
-from functools import cache
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 # Firebase imports (install with: pip install firebase-admin)
 try:
     import firebase_admin
     from firebase_admin import credentials, firestore
+    from google.cloud.firestore_v1.bulk_writer import BulkRetry, BulkWriterOptions
     FIREBASE_AVAILABLE = True
 except ImportError:
     FIREBASE_AVAILABLE = False
     print("Firebase not available. Install with: pip install firebase-admin")
 
-@dataclass
+# Fast JSON parsing (install with: pip install orjson), falls back to stdlib json
+try:
+    import orjson
+    json_loads = orjson.loads
+    
+    def json_dumps(obj: Any, default=None) -> bytes:
+        # Dataclasses are passed to default, as with the stdlib json fallback
+        return orjson.dumps(obj, default=default, option=orjson.OPT_PASSTHROUGH_DATACLASS)
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps(obj: Any, default=None) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, default=default).encode()
+
+# Incremental JSON parsing (install with: pip install ijson)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+def iter_courses_file(file_path: Union[str, Path]):
+    """Iterate over the course dicts of a courses JSON file, streaming when ijson is available"""
+    with open(file_path, "rb") as f:
+        if IJSON_AVAILABLE:
+            yield from ijson.items(f, "item", use_float=True)
+        else:
+            yield from json_loads(f.read())
+
+def dump_courses_file(file_path: Union[str, Path], courses, default=None) -> int:
+    """Stream courses to a JSON array file, one course per line, returning the number written"""
+    # Write to a temporary file first so an interrupted run doesn't leave a truncated file behind
+    file_path = Path(file_path)
+    part_path = file_path.with_name(file_path.name + ".part")
+    count = 0
+    with open(part_path, "wb") as f:
+        f.write(b"[")
+        for course in courses:
+            f.write(b"\n" if count == 0 else b",\n")
+            f.write(json_dumps(course, default))
+            count += 1
+        f.write(b"\n]\n")
+    part_path.replace(file_path)
+    return count
+
+# Precompiled patterns
+WHITESPACE_RUN_RE = re.compile(r"\s+")
+# Date range prefixes and exception/day count suffixes of schedule summaries, removed in one pass
+SCHEDULE_NOISE_RE = re.compile(
+    r"^(?:מ \d\d\.\d\d\., |עד \d\d\.\d\d\., |\d\d\.\d\d\. עד \d\d\.\d\d\., )"
+    r"|, יוצא מן הכלל: .*$"
+    r"|, הכל \d+ ימים$"
+)
+SCHEDULE_DAY_TIME_RE = re.compile(r"(?:יום|יוֹם) (רִאשׁוֹ|ראשון|שני|שלישי|רביעי|חמישי|שישי) (\d\d:\d\d)\s*-\s*(\d\d:\d\d)")
+# Schedules given as specific dates rather than weekdays
+SCHEDULE_SPECIFIC_DATES_RE = re.compile(r"(?:\d\d\.\d\d\.: |(?:\d\d\.\d\d\., )+בהתאמה )\d\d:\d\d-\d\d:\d\d")
+SPORT_COURSE_RE = re.compile(r"03940[89]\d\d")
+SPORT_PE_CATEGORY_RE = re.compile(r"ספורט חינוך גופני\s*-")
+GROUP_NAME_PREFIX_RE = re.compile(r"^SE\d+\s*")
+PREREQ_SINGLE_COURSE_PARENS_RE = re.compile(r"\((\d+)\)")
+PREREQ_OUTER_PARENS_RE = re.compile(r"^\(([^()]+)\)$")
+ADJOINING_HEADER_RE = re.compile(r"^(?:מקצוע צמוד|מקצועות צמודים):", re.MULTILINE)
+ADJOINING_NUMBER_LIST_RE = re.compile(r"\d{5,8}(\s*,\s*\d{5,8})*$", re.MULTILINE)
+ADJOINING_FIRST_SENTENCE_RE = re.compile(r"(.*?)(?:\.$|\.\n|\n\n|$)", re.DOTALL)
+ADJOINING_COURSE_RE = re.compile(r"(\d{5,8})(\s.*)?")
+SAP_TIME_RE = re.compile(r"PT(\d\d)H(\d\d)M\d\dS")
+
+def sap_date_millis(date_str: str) -> Optional[int]:
+    """Return the milliseconds timestamp of an SAP /Date(timestamp)/ string, or None if malformed"""
+    if date_str.startswith("/Date(") and date_str.endswith(")/"):
+        millis = date_str[6:-2]
+        if millis.isascii() and millis.isdigit():
+            return int(millis)
+    return None
+
+def sap_room_number(room_name: str, exact: bool = True) -> Optional[int]:
+    """Return the room number of a "123-4567" room name, or None if malformed.
+    
+    Unless exact, the name may continue after the room number.
+    """
+    if ((len(room_name) == 8 if exact else len(room_name) >= 8) and room_name[3] == "-"
+            and room_name[:3].isdecimal() and room_name[4:8].isdecimal()):
+        return int(room_name[4:8])
+    return None
+
+def sap_whole_minute_time(time_str: str) -> Optional[str]:
+    """Return the "HH:MM" of an SAP PTxxHxxM00S time, or None if malformed"""
+    if (len(time_str) == 11 and time_str.startswith("PT") and time_str[4] == "H" and time_str.endswith("M00S")
+            and time_str[2:4].isdecimal() and time_str[5:7].isdecimal()):
+        return f"{time_str[2:4]}:{time_str[5:7]}"
+    return None
+
+def sap_weekday(date_str: str) -> Optional[int]:
+    """Return the UTC weekday (0=Sunday) of an SAP /Date(timestamp)/ string, or None if malformed"""
+    millis = sap_date_millis(date_str)
+    if millis is None:
+        return None
+    # The epoch, 1970-01-01, was a Thursday
+    return (millis // 86_400_000 + 4) % 7
+
+# Dates and schedule summaries repeat across courses, so their parsed forms are memoized
+
+@lru_cache(maxsize=4096)
+def sap_date_fields(date_str: str) -> Optional[tuple]:
+    """Return the UTC (year, month, day) of an SAP /Date(timestamp)/ string, or None if malformed"""
+    millis = sap_date_millis(date_str)
+    if millis is None:
+        return None
+    return time.gmtime(millis // 1000)[:3]
+
+@lru_cache(maxsize=4096)
+def parse_schedule_text(schedule_text: str) -> tuple:
+    """Parse schedule text into (day, time_begin, time_end) entries"""
+    # Clean up the schedule text
+    schedule_text = SCHEDULE_NOISE_RE.sub("", schedule_text)
+    
+    entries = []
+    for entry in schedule_text.split(","):
+        entry = entry.strip()
+        
+        match = SCHEDULE_DAY_TIME_RE.match(entry)
+        if match:
+            day = match.group(1)
+            if day == "רִאשׁוֹ":
+                day = "ראשון"
+            time_begin = match.group(2)
+            time_end = match.group(3)
+            entries.append((day, time_begin, time_end))
+    
+    return tuple(entries)
+
+def person_display_name(person: Dict[str, str]) -> str:
+    """Format an SAP person entry as "Title FirstName LastName", leaving out empty titles"""
+    name = f"{person['FirstName']} {person['LastName']}"
+    title = person["Title"].strip()
+    return f"{title} {name}" if title and title != "-" else name
+
+# Firestore bulk writer settings
+FIRESTORE_INITIAL_OPS_PER_SECOND = 500
+FIRESTORE_MAX_OPS_PER_SECOND = 9000  # Stay under the 10k writes/sec limit
+FIRESTORE_WRITE_RETRIES = 5
+FIRESTORE_RETRYABLE_CODES = {4, 8, 10, 14}  # DEADLINE_EXCEEDED, RESOURCE_EXHAUSTED, ABORTED, UNAVAILABLE
+FIRESTORE_PROGRESS_INTERVAL = 500
+
+def _on_firestore_write_error(error, bulk_writer) -> bool:
+    """Log failed writes and retry transient errors (the bulk writer backs off between attempts)"""
+    retry = error.code in FIRESTORE_RETRYABLE_CODES and error.attempts < FIRESTORE_WRITE_RETRIES
+    if not retry:
+        print(f"❌ Failed to write {error.operation.reference.path}: {error.message}")
+    return retry
+
+class FirestoreWriteTracker:
+    """Count the outcomes of bulk writer operations, so that failed saves are not reported as saved"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.succeeded = 0
+        self.failed = 0
+    
+    def on_write_result(self, reference, result, bulk_writer):
+        with self._lock:
+            self.succeeded += 1
+    
+    def on_write_error(self, error, bulk_writer) -> bool:
+        retry = _on_firestore_write_error(error, bulk_writer)
+        if not retry:
+            with self._lock:
+                self.failed += 1
+        return retry
+    
+    def check(self, queued: int):
+        """Raise if not all queued writes succeeded (call after flushing the bulk writer)"""
+        if self.failed or self.succeeded < queued:
+            raise RuntimeError(f"{self.failed} Firestore writes failed, {self.succeeded}/{queued} succeeded")
+
+# Semester codes and their display names
+SEMESTER_NAMES = {200: "Winter", 201: "Spring", 202: "Summer"}
+SEMESTER_NAMES_HE = {200: "חורף", 201: "אביב", 202: "קיץ"}
+# SAP exam category codes and the Hebrew names of the exams
+EXAM_CATEGORY_NAMES = {
+    "FI": "מועד א",
+    "FB": "מועד ב",
+    "MI": "בוחן מועד א",
+    "M2": "בוחן מועד ב",
+}
+
+# Placeholder texts of schedule items without a single room or a regular weekly time
+ROOM_TEXT_SEE_DETAILS = "ראה פרטים"
+SCHEDULE_TEXT_IRREGULAR = "לֹא סָדִיר"
+
+# Building name prefixes and their short forms
+BUILDING_NAME_PREFIXES = {
+    "בנין אולמן": "אולמן",
+    "בנין בורוביץ הנדסה אזרחית": "בורוביץ הנדסה אזרחית",
+    "בנין דן קהאן": "דן קהאן",
+    "בנין הנ' אוירונאוטית": "הנ' אוירונאוטית",
+    "בנין זיסאפל": "זיסאפל",
+    "בנין להנדסת חמרים": "הנדסת חמרים",
+    "בנין ליידי דייוס": "ליידי דייוס",
+    "בנין למדעי המחשב": "מדעי המחשב",
+    "בנין ע'ש אמדו": "אמדו",
+    "בנין ע'ש טאוב": "טאוב",
+    "בנין ע'ש סגו": "סגו",
+    "בנין פישבך": "פישבך",
+    "בנין פקולטה לרפואה": "פקולטה לרפואה",
+    "בניין ננו-אלקטרוניקה": "ננו-אלקטרוניקה",
+    "בניין ספורט": "ספורט",
+}
+BUILDING_PREFIX_RE = re.compile("|".join(map(re.escape, BUILDING_NAME_PREFIXES)))
+
+# SAP OData $batch endpoint, each query is sent as one part of a multipart body
+SAP_BATCH_URL = "https://portalex.technion.ac.il/sap/opu/odata/sap/Z_CM_EV_CDIR_DATA_SRV/$batch?sap-client=700"
+SAP_BATCH_BOUNDARY = "batch_1d12-afbf-e3c7"
+SAP_EMPTY_RESULT = {"d": {"results": []}}
+CACHE_DB_NAME = "responses.sqlite3"
+COURSE_BATCH_SIZE = 20  # Courses per $batch request (two queries each)
+PREFETCH_BATCH_SIZE = 50  # Room and building queries per $batch request
+
+_BATCH_PART_PREFIX, _BATCH_PART_SUFFIX = (
+    part.replace("\n", "\r\n").encode()
+    for part in f"""
+--{SAP_BATCH_BOUNDARY}
+Content-Type: application/http
+Content-Transfer-Encoding: binary
+
+GET {{query}} HTTP/1.1
+sap-cancel-on-close: true
+X-Requested-With: X
+sap-contextid-accept: header
+Accept: application/json
+Accept-Language: he
+DataServiceVersion: 2.0
+MaxDataServiceVersion: 2.0
+
+""".split("{query}")
+)
+_BATCH_BODY_END = f"\r\n--{SAP_BATCH_BOUNDARY}--\r\n".encode()
+
+# Constant parts of the queries, URL-encoded once
+_SEMESTERS_QUERY = "SemesterSet?" + urllib.parse.urlencode({
+    "sap-client": "700",
+    "$select": "PiqYear,PiqSession,Begda,Endda",
+})
+_COURSE_NUMBERS_QUERY_PREFIX = "SmObjectSet?" + urllib.parse.urlencode({
+    "sap-client": "700",
+    "$skip": "0",
+    "$top": "10000",
+    "$filter": "",
+})
+_COURSE_NUMBERS_QUERY_SUFFIX = "&" + urllib.parse.urlencode({"$select": "Otjid"})
+_BUILDING_QUERY_PARAMS = urllib.parse.urlencode({"sap-client": "700", "$select": "Building"})
+_ROOM_INFO_QUERY_PREFIX = "EventScheduleSet?" + urllib.parse.urlencode({"sap-client": "700", "$filter": ""})
+_ROOM_INFO_QUERY_SUFFIX = "&" + urllib.parse.urlencode({"$expand": "Rooms"})
+_COURSE_DATA_QUERY_PREFIX = "SmObjectSet?" + urllib.parse.urlencode({"sap-client": "700", "$filter": ""})
+_COURSE_DATA_QUERY_SUFFIX = "&" + urllib.parse.urlencode({
+    "$select": "Otjid,Points,Name,StudyContentDescription,OrgText,ZzAcademicLevelText,ZzSemesterNote,Responsible,Exams,SmRelations,SmPrereq",
+    "$expand": "Responsible,Exams,SmRelations,SmPrereq",
+})
+_COURSE_SCHEDULE_QUERY_PARAMS = urllib.parse.urlencode({
+    "sap-client": "700",
+    "$expand": "EObjectSet,EObjectSet/Persons",
+})
+
+def build_batch_body(queries: List[str]) -> bytes:
+    """Build the multipart $batch request body with one GET part per query"""
+    parts = [_BATCH_PART_PREFIX + query.encode() + _BATCH_PART_SUFFIX for query in queries]
+    parts.append(_BATCH_BODY_END)
+    return b"".join(parts)
+
+def split_batch_response(content: bytes) -> List[tuple]:
+    """Split a multipart $batch response into (HTTP status, JSON payload) pairs, in request order"""
+    newline = b"\r\n" if b"\r\n" in content else b"\n"
+    blank_line = newline * 2
+    content = content.lstrip()
+    
+    # The response uses its own boundary, taken from the first delimiter line
+    delimiter = content[:content.find(newline)]
+    if not delimiter.startswith(b"--"):
+        raise RuntimeError("Invalid response format")
+    
+    parts = []
+    for part in content.split(delimiter)[1:]:
+        if part.startswith(b"--"):  # Closing delimiter
+            break
+        
+        # Skip the multipart part headers, then read the embedded HTTP status line and headers
+        start = part.find(blank_line)
+        if start == -1:
+            raise RuntimeError("Invalid response format")
+        start += len(blank_line)
+        status_line = part[start:part.find(newline, start)].split()
+        start = part.find(blank_line, start)
+        if len(status_line) < 2 or not status_line[1].isdigit() or start == -1:
+            raise RuntimeError("Invalid response format")
+        start += len(blank_line)
+        
+        end = part.find(newline, start)
+        parts.append((int(status_line[1]), part[start:] if end == -1 else part[start:end]))
+    
+    return parts
+
+@dataclass(slots=True)
 class CourseInfo:
     """Data class for course information"""
     course_number: str
@@ -51,14 +358,27 @@ class CourseInfo:
     adjoining_courses: str = ""
     no_additional_credit: str = ""
     notes: str = ""
-    exams: Dict[str, str] = None
-    schedule: List[Dict[str, Any]] = None
-    
-    def __post_init__(self):
-        if self.exams is None:
-            self.exams = {}
-        if self.schedule is None:
-            self.schedule = []
+    exams: Dict[str, str] = field(default_factory=dict)
+    schedule: List[Dict[str, Any]] = field(default_factory=list)
+
+# Hebrew "general" section keys and the CourseInfo attributes they hold, in output order.
+# Keys are interned so every course dict shares the same key objects.
+GENERAL_FIELDS = tuple((sys.intern(key), attr) for key, attr in (
+    ("מספר מקצוע", "course_number"),
+    ("שם מקצוע", "name"),
+    ("סילבוס", "syllabus"),
+    ("פקולטה", "faculty"),
+    ("מסגרת לימודים", "academic_level"),
+    ("נקודות", "points"),
+    ("אחראים", "responsible"),
+    ("הערות", "notes"),
+    ("מקצועות קדם", "prerequisites"),
+    ("מקצועות צמודים", "adjoining_courses"),
+    ("מקצועות ללא זיכוי נוסף", "no_additional_credit"),
+))
+# The JSON output always has the base fields, and the course relations only when set
+JSON_BASE_FIELDS = GENERAL_FIELDS[:8]
+JSON_OPTIONAL_FIELDS = GENERAL_FIELDS[8:]
 
 class TechnionCourseFetcher:
     """Fetcher for Technion course information with Firestore integration"""
@@ -66,11 +386,20 @@ class TechnionCourseFetcher:
     def __init__(self, 
                  cache_dir: Optional[str] = None,
                  firestore_config: Optional[str] = None,
-                 verbose: bool = False):
+                 verbose: bool = False,
+                 max_workers: int = 8):
         """Initialize the course fetcher"""
         self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._cache_db = None
+        self._cache_lock = threading.Lock()
         self.verbose = verbose
-        self.session = requests.Session()
+        self.max_workers = max(1, max_workers)
+        self.session = self._create_session()
+        # Bounds the API requests in flight across all threads using this fetcher
+        self._request_slots = threading.BoundedSemaphore(self.max_workers)
+        self._reported_encoding = False
+        self._building_names: Dict[str, str] = {}
+        self._room_infos: Dict[tuple, Dict[tuple, tuple]] = {}
         
         # Initialize Firestore if config provided
         self.db = None
@@ -87,8 +416,9 @@ class TechnionCourseFetcher:
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
                 "(KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
             ),
-            "Content-Type": "multipart/mixed;boundary=batch_1d12-afbf-e3c7",
+            "Content-Type": f"multipart/mixed;boundary={SAP_BATCH_BOUNDARY}",
             "Accept": "multipart/mixed",
+            "Accept-Encoding": "gzip, deflate",
             "sap-contextid-accept": "header",
             "sap-cancel-on-close": "true",
             "X-Requested-With": "X",
@@ -102,6 +432,21 @@ class TechnionCourseFetcher:
             "Referer": "https://portalex.technion.ac.il/ovv/",
         }
     
+    def _create_session(self) -> requests.Session:
+        """Create an HTTP session with a keep-alive connection pool sized for the worker threads"""
+        retries = Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=None,  # $batch reads are sent as POST
+            respect_retry_after_header=True,
+            raise_on_status=False,  # Let _send_request report the final bad status
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers, max_retries=retries)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        return session
+    
     def _init_firestore(self, config_path: str):
         """Initialize Firestore connection"""
         try:
@@ -112,97 +457,171 @@ class TechnionCourseFetcher:
         except Exception as e:
             print(f"❌ Failed to initialize Firestore: {e}")
     
+    def create_bulk_writer(self, write_tracker: Optional[FirestoreWriteTracker] = None):
+        """Create a Firestore bulk writer that ramps up to the configured write rate, optionally tracking its writes"""
+        bulk_writer = self.db.bulk_writer(options=BulkWriterOptions(
+            initial_ops_per_second=FIRESTORE_INITIAL_OPS_PER_SECOND,
+            max_ops_per_second=FIRESTORE_MAX_OPS_PER_SECOND,
+            retry=BulkRetry.exponential,
+        ))
+        if write_tracker is None:
+            bulk_writer.on_write_error(_on_firestore_write_error)
+        else:
+            bulk_writer.on_write_result(write_tracker.on_write_result)
+            bulk_writer.on_write_error(write_tracker.on_write_error)
+        return bulk_writer
+    
     def _send_request(self, query: str, allow_empty: bool = False) -> Dict[str, Any]:
         """Send request to Technion SAP API with caching"""
+        result = self._send_requests([query], allow_empty)[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    def _send_requests(self, queries: List[str],
+                       allow_empty: Union[bool, List[bool]] = False) -> List[Union[Dict[str, Any], Exception]]:
+        """Send several queries in a single $batch request with caching.
         
-        # Check cache first
-        if self.cache_dir:
-            cache_file = self._get_cache_file(query)
-            if cache_file.exists():
-                with cache_file.open(encoding="utf-8") as f:
-                    if self.verbose:
-                        print(f"📖 Loading from cache: {query[:50]}...")
-                    return json.load(f)
+        allow_empty is either one flag for all queries or a flag per query.
+        Returns one entry per query, either the result or the exception for that query.
+        """
+        if isinstance(allow_empty, bool):
+            allow_empty = [allow_empty] * len(queries)
+        results = [self._load_cached(query) for query in queries]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
         
         if self.verbose:
-            print(f"🌐 Sending request: {query[:50]}...")
+            print(f"🌐 Sending batch of {len(missing)} requests: {queries[missing[0]][:50]}...")
         
-        url = "https://portalex.technion.ac.il/sap/opu/odata/sap/Z_CM_EV_CDIR_DATA_SRV/$batch?sap-client=700"
+        fetched = self._fetch_batch_from_api([queries[i] for i in missing])
+        for i, payload in zip(missing, fetched):
+            if isinstance(payload, Exception):
+                results[i] = payload
+                continue
+            
+            result = json_loads(payload)
+            if not allow_empty[i] and result == SAP_EMPTY_RESULT:
+                result = RuntimeError("Empty response")
+            else:
+                self._store_cached(queries[i], payload)
+            results[i] = result
         
-        data = f"""
---batch_1d12-afbf-e3c7
-Content-Type: application/http
-Content-Transfer-Encoding: binary
-
-GET {query} HTTP/1.1
-sap-cancel-on-close: true
-X-Requested-With: X
-sap-contextid-accept: header
-Accept: application/json
-Accept-Language: he
-DataServiceVersion: 2.0
-MaxDataServiceVersion: 2.0
-
-
---batch_1d12-afbf-e3c7--
-""".replace("\n", "\r\n")
+        return results
+    
+    def _send_requests_chunked(self, queries: List[str],
+                               allow_empty: bool = False) -> List[Union[Dict[str, Any], Exception]]:
+        """Send queries in $batch requests of up to PREFETCH_BATCH_SIZE queries.
         
-        response = self.session.post(url, headers=self.headers, data=data, timeout=60)
+        A failed request only fails its own queries, which get the exception as their result.
+        """
+        results = []
+        for i in range(0, len(queries), PREFETCH_BATCH_SIZE):
+            chunk = queries[i:i + PREFETCH_BATCH_SIZE]
+            try:
+                results.extend(self._send_requests(chunk, allow_empty))
+            except Exception as e:
+                if self.verbose:
+                    print(f"⚠️ Failed to send batch of {len(chunk)} requests: {e}")
+                results.extend([e] * len(chunk))
+        return results
+    
+    def _load_cached(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a query, if any"""
+        if not self.cache_dir:
+            return None
         
-        if response.status_code != 202:
-            raise RuntimeError(f"Bad status code: {response.status_code}")
+        with self._cache_lock:
+            row = self._get_cache_db().execute(
+                "SELECT result FROM responses WHERE query = ?", (query,)
+            ).fetchone()
+        if row is None:
+            return None
         
-        response_chunks = response.text.replace("\r\n", "\n").strip().split("\n\n")
-        if len(response_chunks) != 3:
-            raise RuntimeError(f"Invalid response format")
+        if self.verbose:
+            print(f"📖 Loading from cache: {query[:50]}...")
+        return json_loads(row[0])
+    
+    def _store_cached(self, query: str, payload: bytes):
+        """Cache the raw JSON response payload of a query"""
+        if not self.cache_dir:
+            return
         
-        json_str = response_chunks[2].split("\n", 1)[0]
-        result = json.loads(json_str)
+        with self._cache_lock:
+            self._get_cache_db().execute(
+                "INSERT OR REPLACE INTO responses (query, result) VALUES (?, ?)", (query, payload)
+            )
+    
+    def _get_cache_db(self) -> sqlite3.Connection:
+        """Open the SQLite response cache in cache_dir on first use (call with _cache_lock held)"""
+        if self._cache_db is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.cache_dir / CACHE_DB_NAME, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, a crash can only lose the latest writes
+            db.execute("CREATE TABLE IF NOT EXISTS responses (query TEXT PRIMARY KEY, result BLOB NOT NULL) WITHOUT ROWID")
+            self._cache_db = db
+        return self._cache_db
+    
+    def _fetch_from_api(self, query: str, allow_empty: bool = False) -> Dict[str, Any]:
+        """Send a single query to the Technion SAP API $batch endpoint"""
+        payload = self._fetch_batch_from_api([query])[0]
+        if isinstance(payload, Exception):
+            raise payload
         
-        if not allow_empty and result == {"d": {"results": []}}:
+        result = json_loads(payload)
+        if not allow_empty and result == SAP_EMPTY_RESULT:
             raise RuntimeError("Empty response")
         
-        # Cache the result
-        if self.cache_dir:
-            cache_file = self._get_cache_file(query)
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
-            with cache_file.open("w", encoding="utf-8") as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-        
         return result
     
-    def _get_cache_file(self, query: str) -> Path:
-        """Generate cache file path for query"""
-        cache_name = re.sub(r"[<>:\"/\\|?*]", "_", query)[:64]
-        cache_hash = hashlib.sha256(query.encode()).hexdigest()[:8]
-        return self.cache_dir / f"{cache_name}_{cache_hash}.json"
+    def _fetch_batch_from_api(self, queries: List[str]) -> List[Union[bytes, Exception]]:
+        """Send queries to the Technion SAP API as parts of one $batch request, returning the raw JSON payloads"""
+        data = build_batch_body(queries)
+        
+        with self._request_slots:
+            response = self.session.post(SAP_BATCH_URL, headers=self.headers, data=data, timeout=60)
+        
+        if response.status_code != 202:
+            raise RuntimeError(f"Bad status code: {response.status_code}")
+        
+        if self.verbose and not self._reported_encoding:
+            self._reported_encoding = True
+            print(f"📦 Response Content-Encoding: {response.headers.get('Content-Encoding', 'none')}")
+        
+        parts = split_batch_response(response.content)
+        if len(parts) != len(queries):
+            raise RuntimeError(f"Invalid response format: expected {len(queries)} parts, got {len(parts)}")
+        
+        return [
+            payload if status == 200 else RuntimeError(f"Bad status code: {status}")
+            for status, payload in parts
+        ]
     
-    def _parse_sap_date(self, date_str: str) -> datetime:
-        """Parse SAP date format"""
-        match = re.match(r"/Date\((\d+)\)/", date_str)
-        if not match:
+    def _parse_sap_date_fields(self, date_str: str) -> tuple:
+        """Parse SAP date format into UTC (year, month, day)"""
+        fields = sap_date_fields(date_str)
+        if fields is None:
             raise ValueError(f"Invalid date format: {date_str}")
-        return datetime.fromtimestamp(int(match.group(1)) / 1000, timezone.utc)
+        return fields
     
     def get_semesters(self) -> List[Dict[str, Any]]:
         """Get available semesters"""
-        params = {
-            "sap-client": "700",
-            "$select": "PiqYear,PiqSession,Begda,Endda",
-        }
-        query = f"SemesterSet?{urllib.parse.urlencode(params)}"
-        raw_data = self._send_request(query)
+        raw_data = self._send_request(_SEMESTERS_QUERY)
         
         semesters = []
         for result in raw_data["d"]["results"]:
             year = int(result["PiqYear"])
             semester = int(result["PiqSession"])
             
-            if semester not in [200, 201, 202]:  # Winter, Spring, Summer
+            if semester not in SEMESTER_NAMES:  # Winter, Spring, Summer
                 continue
             
-            start_date = self._parse_sap_date(result["Begda"]).strftime("%Y-%m-%d")
-            end_date = self._parse_sap_date(result["Endda"]).strftime("%Y-%m-%d")
+            start_year, start_month, start_day = self._parse_sap_date_fields(result["Begda"])
+            end_year, end_month, end_day = self._parse_sap_date_fields(result["Endda"])
+            start_date = f"{start_year}-{start_month:02d}-{start_day:02d}"
+            end_date = f"{end_year}-{end_month:02d}-{end_day:02d}"
             
             semesters.append({
                 "year": year,
@@ -216,103 +635,142 @@ MaxDataServiceVersion: 2.0
     
     def get_course_numbers(self, year: int, semester: int) -> List[str]:
         """Get all course numbers for a semester"""
-        params = {
-            "sap-client": "700",
-            "$skip": "0",
-            "$top": "10000",
-            "$filter": f"Peryr eq '{year}' and Perid eq '{semester}'",
-            "$select": "Otjid",
-        }
-        query = f"SmObjectSet?{urllib.parse.urlencode(params)}"
-        raw_data = self._send_request(query)
+        semester_filter = urllib.parse.quote_plus(f"Peryr eq '{year}' and Perid eq '{semester}'")
+        raw_data = self._send_request(_COURSE_NUMBERS_QUERY_PREFIX + semester_filter + _COURSE_NUMBERS_QUERY_SUFFIX)
         return [x["Otjid"] for x in raw_data["d"]["results"]]
     
-    @cache
     def get_building_name(self, year: int, semester: int, room_id: str):
         """Get building name from room ID"""
         if not room_id:
             return ""
         
-        params = {"sap-client": "700", "$select": "Building"}
-        query = f"GObjectSet(Otjid='{urllib.parse.quote(room_id)}',Peryr='{year}',Perid='{semester}')?{urllib.parse.urlencode(params)}"
-        
+        # Room ids keep their building across semesters, so names are cached by room id only
+        building = self._building_names.get(room_id)
+        if building is None:
+            building = self._building_names[room_id] = self._fetch_building_name(year, semester, room_id)
+        return building
+    
+    def _building_query(self, year: int, semester: int, room_id: str) -> str:
+        """Build the building name query for a room ID"""
+        return f"GObjectSet(Otjid='{urllib.parse.quote(room_id)}',Peryr='{year}',Perid='{semester}')?{_BUILDING_QUERY_PARAMS}"
+    
+    def _fetch_building_name(self, year: int, semester: int, room_id: str) -> str:
+        """Fetch and shorten the building name of a room"""
+        try:
+            raw_data = self._send_request(self._building_query(year, semester, room_id))
+        except Exception:
+            return ""
+        return self._parse_building_name(raw_data)
+    
+    def _parse_building_name(self, raw_data: Dict[str, Any]) -> str:
+        """Parse and shorten the building name of a room query result"""
         try:
-            raw_data = self._send_request(query)
             building = raw_data["d"]["Building"]
             if building:
-                building = re.sub(r"\s+", " ", building.strip())
-                # Apply building name mappings
-                building_mapping = {
-                    "בנין אולמן": "אולמן",
-                    "בנין בורוביץ הנדסה אזרחית": "בורוביץ הנדסה אזרחית",
-                    "בנין דן קהאן": "דן קהאן",
-                    "בנין הנ' אוירונאוטית": "הנ' אוירונאוטית",
-                    "בנין זיסאפל": "זיסאפל",
-                    "בנין להנדסת חמרים": "הנדסת חמרים",
-                    "בנין ליידי דייוס": "ליידי דייוס",
-                    "בנין למדעי המחשב": "מדעי המחשב",
-                    "בנין ע'ש אמדו": "אמדו",
-                    "בנין ע'ש טאוב": "טאוב",
-                    "בנין ע'ש סגו": "סגו",
-                    "בנין פישבך": "פישבך",
-                    "בנין פקולטה לרפואה": "פקולטה לרפואה",
-                    "בניין ננו-אלקטרוניקה": "ננו-אלקטרוניקה",
-                    "בניין ספורט": "ספורט",
-                }
-                for old, new in building_mapping.items():
-                    if building.startswith(old):
-                        return new + building[len(old):]
+                building = WHITESPACE_RUN_RE.sub(" ", building.strip())
+                # Shorten known building names
+                if match := BUILDING_PREFIX_RE.match(building):
+                    return BUILDING_NAME_PREFIXES[match.group()] + building[match.end():]
                 return building
         except Exception:
             pass
         
         return ""
     
-    def _parse_schedule_text(self, schedule_text: str) -> List[tuple]:
-        """Parse schedule text into day/time entries"""
-        # Clean up the schedule text
-        schedule_text = re.sub(r"^מ \d\d\.\d\d\., ", "", schedule_text)
-        schedule_text = re.sub(r"^עד \d\d\.\d\d\., ", "", schedule_text)
-        schedule_text = re.sub(r"^\d\d\.\d\d\. עד \d\d\.\d\d\., ", "", schedule_text)
-        schedule_text = re.sub(r", יוצא מן הכלל: .*$", "", schedule_text)
-        schedule_text = re.sub(r", הכל \d+ ימים$", "", schedule_text)
-        
-        entries = []
-        for entry in schedule_text.split(","):
-            entry = entry.strip()
+    def _prefetch_schedule_rooms(self, year: int, semester: int,
+                                 raw_schedules: List[Union[Dict[str, Any], Exception]]):
+        """Fetch the room information and buildings needed by several schedule query results in $batch requests"""
+        room_ids = []
+        event_ids = []
+        try:
+            # Mirrors the room lookups of _parse_course_schedule
+            for raw_schedule in raw_schedules:
+                if isinstance(raw_schedule, Exception):
+                    continue
+                for group in raw_schedule["d"]["results"]:
+                    for raw_item in group["EObjectSet"]["results"]:
+                        schedule_text = raw_item.get("ScheduleSummary", "")
+                        if (not schedule_text or schedule_text == SCHEDULE_TEXT_IRREGULAR or
+                                SCHEDULE_SPECIFIC_DATES_RE.match(schedule_text)):
+                            continue
+                        
+                        room_text = raw_item.get("RoomText", "")
+                        if room_text and room_text != ROOM_TEXT_SEE_DETAILS:
+                            if sap_room_number(room_text, exact=False) is not None:
+                                room_ids.append(raw_item.get("RoomId", ""))
+                        elif event_id := raw_item.get("Otjid", ""):
+                            event_ids.append(event_id)
             
-            match = re.match(
-                r"(?:יום|יוֹם) (רִאשׁוֹ|ראשון|שני|שלישי|רביעי|חמישי|שישי) (\d\d:\d\d)\s*-\s*(\d\d:\d\d)",
-                entry
-            )
-            if match:
-                day = match.group(1)
-                if day == "רִאשׁוֹ":
-                    day = "ראשון"
-                time_begin = match.group(2)
-                time_end = match.group(3)
-                entries.append((day, time_begin, time_end))
+            event_ids = [
+                event_id for event_id in dict.fromkeys(event_ids)
+                if (year, semester, event_id) not in self._room_infos
+            ]
+        except Exception as e:
+            # Leave the rooms to be looked up one by one
+            if self.verbose:
+                print(f"⚠️ Failed to prefetch room information: {e}")
+            return
+        
+        # Events without rooms are stored too, so they are not fetched again one by one
+        raw_events = self._send_requests_chunked(
+            [self._room_info_query(year, semester, event_id) for event_id in event_ids], allow_empty=True
+        )
+        
+        # Buildings of the event rooms are fetched together with those of the schedule rooms
+        fetched_events = []
+        for event_id, raw_data in zip(event_ids, raw_events):
+            if isinstance(raw_data, Exception):
+                continue
+            try:
+                # Only rooms that _parse_room_info can use need their building
+                room_ids.extend(room.get("Otjid", "") for result in raw_data["d"]["results"]
+                                for room in result.get("Rooms", {}).get("results", [])
+                                if sap_room_number(room.get("Name", "")) is not None)
+            except Exception:
+                continue
+            fetched_events.append((event_id, raw_data))
+        self.prefetch_building_names(year, semester, room_ids)
+        
+        for event_id, raw_data in fetched_events:
+            try:
+                self._room_infos[(year, semester, event_id)] = self._parse_room_info(year, semester, raw_data)
+            except Exception:
+                pass  # get_room_info retries and reports the failure
+    
+    def prefetch_building_names(self, year: int, semester: int, room_ids: Iterable[str]):
+        """Fetch the building names of rooms not looked up yet in $batch requests"""
+        missing = [room_id for room_id in dict.fromkeys(room_ids) if room_id and room_id not in self._building_names]
+        results = self._send_requests_chunked([self._building_query(year, semester, room_id) for room_id in missing])
         
-        return entries
+        for room_id, raw_data in zip(missing, results):
+            # Failed rooms are left to be looked up one by one
+            if not isinstance(raw_data, Exception):
+                self._building_names[room_id] = self._parse_building_name(raw_data)
+    
+    def _course_schedule_query(self, year: int, semester: int, course_number: str) -> str:
+        """Build the schedule query for a course number without SM prefix"""
+        return f"SmObjectSet(Otjid='SM{course_number}',Peryr='{year}',Perid='{semester}',ZzCgOtjid='',ZzPoVersion='',ZzScOtjid='')/SeObjectSet?{_COURSE_SCHEDULE_QUERY_PARAMS}"
     
     def get_course_schedule(self, year: int, semester: int, course_number: str) -> List[Dict[str, Any]]:
         """Get course schedule information"""
-        params = {
-            "sap-client": "700",
-            "$expand": "EObjectSet,EObjectSet/Persons",
-        }
-        query = f"SmObjectSet(Otjid='SM{course_number}',Peryr='{year}',Perid='{semester}',ZzCgOtjid='',ZzPoVersion='',ZzScOtjid='')/SeObjectSet?{urllib.parse.urlencode(params)}"
+        query = self._course_schedule_query(year, semester, course_number)
         
         try:
             raw_data = self._send_request(query, allow_empty=True)
         except RuntimeError:
             return []
         
+        return self._parse_course_schedule(year, semester, course_number, raw_data)
+    
+    def _parse_course_schedule(self, year: int, semester: int, course_number: str,
+                               raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parse the schedule query result of a course"""
         schedule_results = raw_data["d"]["results"]
         if not schedule_results:
             return []
         
         schedule = []
+        is_sport_course = SPORT_COURSE_RE.match(course_number) is not None
         
         def raw_schedule_sort_key(raw_schedule):
             # Sort by group id in ascending order, but place 0 groups at the end.
@@ -326,65 +784,51 @@ MaxDataServiceVersion: 2.0
                 category = raw_item["CategoryText"]
                 
                 # Handle special cases for sport courses
-                is_sport_course = re.match(r"03940[89]\d\d", course_number) is not None
                 if is_sport_course:
                     if category in ["ספורט", "נבחרת ספורט"]:
                         category = raw_item["Name"]
-                        if (re.match(r"ספורט חינוך גופני\s*-", category) or 
+                        if (SPORT_PE_CATEGORY_RE.match(category) or 
                             category == "ספורט נבחרות ספורט"):
                             if raw_schedule["Name"]:
-                                category = re.sub(r"^SE\d+\s*", "", raw_schedule["Name"])
+                                category = GROUP_NAME_PREFIX_RE.sub("", raw_schedule["Name"])
                 elif category not in ["הרצאה", "תרגול", "מעבדה", "פרויקט", "סמינר"]:
                     # Skip unknown categories or handle them
                     if category:
                         pass  # Keep the original category
                 
+                # Parse schedule text
+                schedule_text = raw_item.get("ScheduleSummary", "")
+                if not schedule_text or schedule_text == SCHEDULE_TEXT_IRREGULAR:
+                    continue
+                
+                # Skip specific dates
+                if SCHEDULE_SPECIFIC_DATES_RE.match(schedule_text):
+                    continue
+                
                 # Extract room information
                 building = ""
                 room = 0
                 building_room_dict = None
                 room_text = raw_item.get("RoomText", "")
                 
-                if room_text and room_text != "ראה פרטים":
-                    room_match = re.match(r"(\d\d\d)-(\d\d\d\d)", room_text)
-                    if room_match:
+                if room_text and room_text != ROOM_TEXT_SEE_DETAILS:
+                    room_number = sap_room_number(room_text, exact=False)
+                    if room_number is not None:
                         building = self.get_building_name(year, semester, raw_item.get("RoomId", ""))
-                        room = int(room_match.group(2))
-                elif room_text == "ראה פרטים" or not room_text:
+                        room = room_number
+                else:
                     # Try to get room information from EventScheduleSet
                     event_id = raw_item.get("Otjid", "")
                     if event_id:
                         building_room_dict = self.get_room_info(year, semester, event_id)
                         if self.verbose and building_room_dict:
                             print(f"📍 Found room info via EventScheduleSet for {event_id}: {len(building_room_dict)} time slots")
-                else:
-                    # Try to get room info from event schedule
-                    event_schedule_id = raw_item.get("Otjid", "").replace("SM", "")
-                    room_info = self.get_room_info(year, semester, event_schedule_id)
-                    if room_info:
-                        (building, room) = list(room_info.values())[0]
                 
                 # Extract staff information
-                staff = ""
-                for person in raw_item["Persons"]["results"]:
-                    title = person["Title"].strip()
-                    if title and title != "-":
-                        staff += f"{title} "
-                    staff += f"{person['FirstName']} {person['LastName']}\n"
-                staff = staff.rstrip("\n")
-                
-                # Parse schedule text
-                schedule_text = raw_item.get("ScheduleSummary", "")
-                if not schedule_text or schedule_text == "לֹא סָדִיר":
-                    continue
-                
-                # Skip specific dates
-                if (re.match(r"\d\d\.\d\d\.: \d\d:\d\d-\d\d:\d\d", schedule_text) or 
-                    re.match(r"(\d\d\.\d\d\., )+בהתאמה \d\d:\d\d-\d\d:\d\d", schedule_text)):
-                    continue
+                staff = "\n".join(map(person_display_name, raw_item["Persons"]["results"]))
                 
                 # Parse day and time
-                day_time_entries = self._parse_schedule_text(schedule_text)
+                day_time_entries = parse_schedule_text(schedule_text)
                 
                 for day, time_begin, time_end in day_time_entries:
                     # Use building_room_dict if available (for cases where RoomText was empty or "ראה פרטים")
@@ -435,8 +879,8 @@ MaxDataServiceVersion: 2.0
                 prereq += " או "
         
         # Clean up parentheses
-        prereq = re.sub(r"\((\d+)\)", r"\1", prereq)
-        prereq = re.sub(r"^\(([^()]+)\)$", r"\1", prereq)
+        prereq = PREREQ_SINGLE_COURSE_PARENS_RE.sub(r"\1", prereq)
+        prereq = PREREQ_OUTER_PARENS_RE.sub(r"\1", prereq)
         return prereq.strip()
     
     def _extract_relations(self, relations_data: List[Dict]) -> str:
@@ -455,12 +899,7 @@ MaxDataServiceVersion: 2.0
         if not semester_notes:
             return []
         
-        parts = re.split(
-            r"^(?:מקצוע צמוד|מקצועות צמודים):",
-            semester_notes,
-            maxsplit=1,
-            flags=re.MULTILINE,
-        )
+        parts = ADJOINING_HEADER_RE.split(semester_notes, maxsplit=1)
         
         if len(parts) == 1:
             return []
@@ -469,12 +908,12 @@ MaxDataServiceVersion: 2.0
         courses = []
         
         # Try to extract course numbers
-        if match := re.match(r"\d{5,8}(\s*,\s*\d{5,8})*$", content, flags=re.MULTILINE):
+        if match := ADJOINING_NUMBER_LIST_RE.match(content):
             courses = [x.strip() for x in match.group(0).split(",")]
-        elif match := re.match(r"(.*?)(?:\.$|\.\n|\n\n|$)", content, flags=re.DOTALL):
+        elif match := ADJOINING_FIRST_SENTENCE_RE.match(content):
             for adjoining_course in match.group(1).split(","):
                 adjoining_course = adjoining_course.strip()
-                match = re.match(r"(\d{5,8})(\s.*)?", adjoining_course)
+                match = ADJOINING_COURSE_RE.match(adjoining_course)
                 if match:
                     courses.append(match.group(1))
         
@@ -484,9 +923,9 @@ MaxDataServiceVersion: 2.0
             if len(course) <= 6:
                 course = course.zfill(6)
                 # Convert old format to new format if needed
-                if re.match(r"^9730\d\d$", course):
+                if course.startswith("9730") and course[4:].isdigit():
                     course = "970300" + course[4:]
-                elif re.match(r"^\d{3}\d{3}$", course):
+                elif course.isdigit():
                     course = "0" + course[:3] + "0" + course[3:]
             else:
                 course = course.zfill(8)
@@ -494,17 +933,62 @@ MaxDataServiceVersion: 2.0
         
         return result
     
+    def _course_data_query(self, year: int, semester: int, course_number: str) -> str:
+        """Build the course details query for a course number (Otjid)"""
+        course_filter = urllib.parse.quote_plus(f"Peryr eq '{year}' and Perid eq '{semester}' and Otjid eq '{course_number}'")
+        return _COURSE_DATA_QUERY_PREFIX + course_filter + _COURSE_DATA_QUERY_SUFFIX
+    
     def get_course_data(self, year: int, semester: int, course_number: str) -> CourseInfo:
         """Get detailed course information"""
-        params = {
-            "sap-client": "700",
-            "$filter": f"Peryr eq '{year}' and Perid eq '{semester}' and Otjid eq '{course_number}'",
-            "$select": "Otjid,Points,Name,StudyContentDescription,OrgText,ZzAcademicLevelText,ZzSemesterNote,Responsible,Exams,SmRelations,SmPrereq",
-            "$expand": "Responsible,Exams,SmRelations,SmPrereq",
-        }
-        query = f"SmObjectSet?{urllib.parse.urlencode(params)}"
-        raw_data = self._send_request(query)
+        raw_data = self._send_request(self._course_data_query(year, semester, course_number))
+        return self._parse_course_data(year, semester, course_number, raw_data)
+    
+    def get_course_data_batch(self, year: int, semester: int,
+                              course_numbers: List[str]) -> List[Union[CourseInfo, Exception]]:
+        """Get detailed course information for several courses in a single $batch request.
+        
+        Returns one entry per course number, either the course or the exception raised for it.
+        """
+        queries = []
+        for course_number in course_numbers:
+            queries.append(self._course_data_query(year, semester, course_number))
+            queries.append(self._course_schedule_query(year, semester, course_number.removeprefix("SM")))
+        # Empty details are an error and must not be cached, empty schedules are valid
+        results = self._send_requests(queries, allow_empty=[False, True] * len(course_numbers))
+        
+        # Look up the rooms of all schedules together rather than item by item
+        self._prefetch_schedule_rooms(year, semester, results[1::2])
+        
+        courses = []
+        for course_number, raw_data, raw_schedule in zip(course_numbers, results[::2], results[1::2]):
+            try:
+                if isinstance(raw_data, Exception):
+                    raise raw_data
+                courses.append(self._parse_course_data(year, semester, course_number, raw_data, raw_schedule))
+            except Exception as e:
+                courses.append(e)
+        return courses
+    
+    def _get_course_data_chunk(self, year: int, semester: int,
+                               course_numbers: List[str]) -> List[Union[CourseInfo, Exception]]:
+        """Get several courses in a $batch request, falling back to one request per course if it fails"""
+        try:
+            return self.get_course_data_batch(year, semester, course_numbers)
+        except Exception as e:
+            if self.verbose:
+                print(f"⚠️ Batch request failed, fetching {len(course_numbers)} courses one by one: {e}")
         
+        courses = []
+        for course_number in course_numbers:
+            try:
+                courses.append(self.get_course_data(year, semester, course_number))
+            except Exception as e:
+                courses.append(e)
+        return courses
+    
+    def _parse_course_data(self, year: int, semester: int, course_number: str, raw_data: Dict[str, Any],
+                           raw_schedule: Union[Dict[str, Any], Exception, None] = None) -> CourseInfo:
+        """Parse the course details query result, fetching the schedule unless already given"""
         results = raw_data["d"]["results"]
         if len(results) != 1:
             raise RuntimeError(f"Expected 1 result for {course_number}, got {len(results)}")
@@ -512,23 +996,15 @@ MaxDataServiceVersion: 2.0
         course_data = results[0]
         
         # Extract course number without SM prefix
-        clean_course_number = course_data["Otjid"]
-        if clean_course_number.startswith("SM"):
-            clean_course_number = clean_course_number[2:]
+        clean_course_number = course_data["Otjid"].removeprefix("SM")
         
         # Format points
         points = course_data["Points"]
-        points = re.sub(r"(\.[1-9]+)0+$", r"\1", points)
-        points = re.sub(r"\.0+$", r"", points)
+        if "." in points:
+            points = points.rstrip("0").rstrip(".")
         
         # Extract responsible staff
-        responsible = ""
-        for person in course_data["Responsible"]["results"]:
-            title = person["Title"].strip()
-            if title and title != "-":
-                responsible += f"{title} "
-            responsible += f"{person['FirstName']} {person['LastName']}\n"
-        responsible = responsible.rstrip("\n")
+        responsible = "\n".join(map(person_display_name, course_data["Responsible"]["results"]))
         
         # Extract prerequisites
         prereq = self._extract_prerequisites(course_data["SmPrereq"]["results"])
@@ -541,43 +1017,41 @@ MaxDataServiceVersion: 2.0
         
         # Process exams
         exams = {}
-        exam_mapping = {
-            "FI": "מועד א",
-            "FB": "מועד ב", 
-            "MI": "בוחן מועד א",
-            "M2": "בוחן מועד ב"
-        }
-        
         for exam in course_data["Exams"]["results"]:
             category = exam.get("CategoryCode")
-            if category not in exam_mapping:
+            if category not in EXAM_CATEGORY_NAMES:
                 continue
             
             date_raw = exam.get("ExamDate")
             if not date_raw:
                 continue
             
-            date = self._parse_sap_date(date_raw).strftime("%d-%m-%Y")
+            exam_year, exam_month, exam_day = self._parse_sap_date_fields(date_raw)
+            date = f"{exam_day:02d}-{exam_month:02d}-{exam_year}"
             
             # Extract time if available
             time_begin_raw = exam.get("ExamBegTime", "")
             time_end_raw = exam.get("ExamEndTime", "")
             
             time_str = ""
-            if time_begin_raw and time_end_raw:
-                begin_match = re.match(r"PT(\d\d)H(\d\d)M\d\dS", time_begin_raw)
-                end_match = re.match(r"PT(\d\d)H(\d\d)M\d\dS", time_end_raw)
-                
-                if begin_match and end_match:
-                    time_begin = f"{begin_match.group(1)}:{begin_match.group(2)}"
-                    time_end = f"{end_match.group(1)}:{end_match.group(2)}"
-                    if time_begin != "00:00" or time_end != "00:00":
-                        time_str = f" {time_begin} - {time_end}"
+            if (time_begin_raw and time_end_raw and
+                    SAP_TIME_RE.match(time_begin_raw) and SAP_TIME_RE.match(time_end_raw)):
+                # Both look like PT09H30M00S, so hours and minutes sit at fixed offsets
+                time_begin = f"{time_begin_raw[2:4]}:{time_begin_raw[5:7]}"
+                time_end = f"{time_end_raw[2:4]}:{time_end_raw[5:7]}"
+                if time_begin != "00:00" or time_end != "00:00":
+                    time_str = f" {time_begin} - {time_end}"
             
-            exams[exam_mapping[category]] = f"{date}{time_str}"
+            exams[EXAM_CATEGORY_NAMES[category]] = f"{date}{time_str}"
         
         # Get schedule
-        schedule = self.get_course_schedule(year, semester, clean_course_number)
+        if raw_schedule is None:
+            schedule = self.get_course_schedule(year, semester, clean_course_number)
+        elif isinstance(raw_schedule, Exception):
+            # Empty schedules are valid results, so this is a failed request and the course fails with it
+            raise raw_schedule
+        else:
+            schedule = self._parse_course_schedule(year, semester, clean_course_number, raw_schedule)
         
         return CourseInfo(
             course_number=clean_course_number,
@@ -595,89 +1069,70 @@ MaxDataServiceVersion: 2.0
             schedule=schedule
         )
     
-    def save_to_json(self, courses: List[CourseInfo], file_path: str):
-        """Save courses to JSON file"""
-        courses_data = []
-        for course in courses:
-            course_dict = {
-                "general": {
-                    "מספר מקצוע": course.course_number,
-                    "שם מקצוע": course.name,
-                    "סילבוס": course.syllabus,
-                    "פקולטה": course.faculty,
-                    "מסגרת לימודים": course.academic_level,
-                    "נקודות": course.points,
-                    "אחראים": course.responsible,
-                    "הערות": course.notes,
-                },
-                "schedule": course.schedule
-            }
-            
-            # Add optional fields
-            if course.prerequisites:
-                course_dict["general"]["מקצועות קדם"] = course.prerequisites
-            if course.adjoining_courses:
-                course_dict["general"]["מקצועות צמודים"] = course.adjoining_courses
-            if course.no_additional_credit:
-                course_dict["general"]["מקצועות ללא זיכוי נוסף"] = course.no_additional_credit
-            
-            # Add exam information
-            for exam_type, exam_date in course.exams.items():
-                if exam_date:
-                    course_dict["general"][exam_type] = exam_date
-            
-            courses_data.append(course_dict)
-        
+    def _course_to_dict(self, course: CourseInfo) -> Dict[str, Any]:
+        """Convert a course to the JSON output format"""
+        return {
+            "general": {
+                **{key: getattr(course, attr) for key, attr in JSON_BASE_FIELDS},
+                **{key: value for key, attr in JSON_OPTIONAL_FIELDS if (value := getattr(course, attr))},
+                **{exam_type: exam_date for exam_type, exam_date in course.exams.items() if exam_date},
+            },
+            "schedule": course.schedule
+        }
+    
+    def save_to_json(self, courses: Iterable[CourseInfo], file_path: str):
+        """Save courses to JSON file, serializing one course at a time"""
         Path(file_path).parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(courses_data, f, indent=2, ensure_ascii=False)
+        count = dump_courses_file(file_path, courses, default=self._course_to_dict)
         
-        print(f"✅ Saved {len(courses_data)} courses to {file_path}")
+        print(f"✅ Saved {count} courses to {file_path}")
     
-    def save_to_firestore(self, courses: List[CourseInfo], year: int, semester: int):
+    def save_to_firestore(self, courses: Iterable[CourseInfo], year: int, semester: int):
         """Save courses to Firestore"""
         if not self.db:
             print("❌ Firestore not initialized")
             return
         
         collection_name = f"courses_{year}_{semester}"
-        batch = self.db.batch()
+        collection_ref = self.db.collection(collection_name)
+        write_tracker = FirestoreWriteTracker()
+        bulk_writer = self.create_bulk_writer(write_tracker)
         
-        for i, course in enumerate(courses):
-            doc_ref = self.db.collection(collection_name).document(course.course_number)
-            
-            course_data = {
-                "courseNumber": course.course_number,
-                "name": course.name,
-                "syllabus": course.syllabus,
-                "faculty": course.faculty,
-                "academicLevel": course.academic_level,
-                "points": course.points,
-                "responsible": course.responsible,
-                "prerequisites": course.prerequisites,
-                "adjoiningCourses": course.adjoining_courses,
-                "noAdditionalCredit": course.no_additional_credit,
-                "notes": course.notes,
-                "exams": course.exams,
-                "schedule": course.schedule,
-                "lastUpdated": firestore.SERVER_TIMESTAMP,
-                "year": year,
-                "semester": semester
-            }
-            
-            batch.set(doc_ref, course_data)
+        count = 0
+        try:
+            for count, course in enumerate(courses, 1):
+                doc_ref = collection_ref.document(course.course_number)
+                
+                course_data = {
+                    "courseNumber": course.course_number,
+                    "name": course.name,
+                    "syllabus": course.syllabus,
+                    "faculty": course.faculty,
+                    "academicLevel": course.academic_level,
+                    "points": course.points,
+                    "responsible": course.responsible,
+                    "prerequisites": course.prerequisites,
+                    "adjoiningCourses": course.adjoining_courses,
+                    "noAdditionalCredit": course.no_additional_credit,
+                    "notes": course.notes,
+                    "exams": course.exams,
+                    "schedule": course.schedule,
+                    "lastUpdated": firestore.SERVER_TIMESTAMP,
+                    "year": year,
+                    "semester": semester
+                }
+                
+                bulk_writer.set(doc_ref, course_data)
+                
+                if count % FIRESTORE_PROGRESS_INTERVAL == 0:
+                    print(f"📝 Queued {count} courses")
             
-            # Commit in batches of 500 (Firestore limit)
-            if (i + 1) % 500 == 0:
-                batch.commit()
-                batch = self.db.batch()
-                print(f"📝 Committed batch {(i + 1) // 500}")
+            bulk_writer.flush()
+            write_tracker.check(count)
+        finally:
+            bulk_writer.close()
         
-        # Commit remaining documents
-        if len(courses) % 500 != 0:
-            batch.commit()
-        
-        print(f"✅ Saved {len(courses)} courses to Firestore collection: {collection_name}")
+        print(f"✅ Saved {count} courses to Firestore collection: {collection_name}")
     
     def fetch_semester_courses(self, 
                               year: int, 
@@ -692,121 +1147,164 @@ MaxDataServiceVersion: 2.0
         
         courses = []
         failed_courses = []
+        fetched = self._iter_semester_courses(year, semester, course_numbers, failed_courses)
         
-        for i, course_number in enumerate(course_numbers, 1):
-            try:
-                if self.verbose:
-                    print(f"[{i}/{len(course_numbers)}] Fetching {course_number}")
-                else:
-                    if i % 10 == 0:
-                        print(f"📖 Processed {i}/{len(course_numbers)} courses")
-                
-                course = self.get_course_data(year, semester, course_number)
+        # Queue courses to a Firestore writer thread while fetching continues
+        firestore_queue = None
+        if save_to_firestore:
+            firestore_queue = queue.Queue()
+            firestore_executor = ThreadPoolExecutor(max_workers=1)
+            firestore_save = firestore_executor.submit(
+                self.save_to_firestore, iter(firestore_queue.get, None), year, semester
+            )
+        
+        def collected():
+            for course in fetched:
                 courses.append(course)
-                
-                # Small delay to be respectful to the server
-                time.sleep(0.1)
-                
-            except Exception as e:
-                failed_courses.append(course_number)
-                if self.verbose:
-                    print(f"❌ Failed to fetch {course_number}: {e}")
+                if firestore_queue is not None:
+                    firestore_queue.put(course)
+                yield course
+        
+        try:
+            # Save to local file, writing each course as soon as it is fetched
+            if output_dir:
+                filename = f"courses_{year}_{semester}.json"
+                filepath = Path(output_dir) / filename
+                self.save_to_json(collected(), str(filepath))
+            else:
+                for _ in collected():
+                    pass
+        finally:
+            if firestore_queue is not None:
+                firestore_queue.put(None)
+                firestore_executor.shutdown()
         
         if failed_courses:
             print(f"⚠️  Failed to fetch {len(failed_courses)} courses")
         
-        # Save to local file
-        if output_dir:
-            filename = f"courses_{year}_{semester}.json"
-            filepath = Path(output_dir) / filename
-            self.save_to_json(courses, str(filepath))
-        
-        # Save to Firestore
-        if save_to_firestore:
-            self.save_to_firestore(courses, year, semester)
+        if firestore_queue is not None:
+            firestore_save.result()
         
         return courses
     
+    def _iter_semester_courses(self, year: int, semester: int, course_numbers: List[str], failed_courses: List[str]):
+        """Fetch courses concurrently, yielding them in the original order and collecting failed course numbers"""
+        # Courses are fetched in $batch requests of COURSE_BATCH_SIZE courses.
+        # The load on the server is bounded by max_workers requests in flight.
+        chunks = [
+            course_numbers[i:i + COURSE_BATCH_SIZE]
+            for i in range(0, len(course_numbers), COURSE_BATCH_SIZE)
+        ]
+        processed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._get_course_data_chunk, year, semester, chunk) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = [e] * len(chunk)
+                
+                for course_number, result in zip(chunk, results):
+                    processed += 1
+                    if isinstance(result, Exception):
+                        failed_courses.append(course_number)
+                        if self.verbose:
+                            print(f"❌ Failed to fetch {course_number}: {result}")
+                        continue
+                    
+                    if self.verbose:
+                        print(f"[{processed}/{len(course_numbers)}] Fetched {course_number}")
+                    yield result
+                
+                if not self.verbose:
+                    print(f"📖 Processed {processed}/{len(course_numbers)} courses")
+    
+    def _room_info_query(self, year: int, semester: int, event_schedule_id: str) -> str:
+        """Build the room information query for an event schedule ID"""
+        event_filter = urllib.parse.quote_plus(
+            f"Otjid eq '{event_schedule_id}' and Peryr eq '{year}' and Perid eq '{semester}'"
+        )
+        return _ROOM_INFO_QUERY_PREFIX + event_filter + _ROOM_INFO_QUERY_SUFFIX
+    
     def get_room_info(self, year: int, semester: int, event_schedule_id: str) -> Dict[tuple, tuple]:
         """Get room information for a specific event schedule ID"""
-        params = {
-            "sap-client": "700",
-            "$filter": (
-                f"Otjid eq '{event_schedule_id}' and Peryr eq '{year}' and Perid eq"
-                f" '{semester}'"
-            ),
-            "$expand": "Rooms",
-        }
+        key = (year, semester, event_schedule_id)
+        rooms_by_time = self._room_infos.get(key)
+        if rooms_by_time is not None:
+            return rooms_by_time
         
         try:
-            raw_data = self._send_request(f"EventScheduleSet?{urllib.parse.urlencode(params)}")
-            results = raw_data["d"]["results"]
+            raw_data = self._send_request(self._room_info_query(year, semester, event_schedule_id))
+            rooms_by_time = self._parse_room_info(year, semester, raw_data)
+        except Exception as e:
+            if self.verbose:
+                print(f"❌ Failed to get room info for {event_schedule_id}: {e}")
+            return {}
+        
+        self._room_infos[key] = rooms_by_time
+        return rooms_by_time
+    
+    def _parse_room_info(self, year: int, semester: int, raw_data: Dict[str, Any]) -> Dict[tuple, tuple]:
+        """Parse the room information query result of an event into (weekday, begin, end) -> (building, room)"""
+        results = raw_data["d"]["results"]
+        
+        rooms_by_time = {}
+        
+        for result in results:
+            try:
+                date_raw = result["Evdat"]
+                begin_raw = result["Beguz"]
+                end_raw = result["Enduz"]
+                rooms = result["Rooms"]["results"]
+            except KeyError:
+                # Rows without rooms can't have a location either
+                continue
             
-            rooms_by_time = {}
+            if not date_raw or not begin_raw or not end_raw:
+                continue
             
-            for result in results:
-                date_raw = result.get("Evdat", "")
-                begin_raw = result.get("Beguz", "")
-                end_raw = result.get("Enduz", "")
-                
-                if not date_raw or not begin_raw or not end_raw:
-                    continue
-                
-                # Parse date
-                date = self._sap_date_parse(date_raw)
-                weekday = (date.weekday() + 1) % 7  # Convert to 0=Sunday format
-                
-                # Parse begin time
-                begin_match = re.fullmatch(r"PT(\d\d)H(\d\d)M00S", begin_raw)
-                if not begin_match:
-                    continue
-                begin_time = f"{begin_match.group(1)}:{begin_match.group(2)}"
+            # Parse date
+            weekday = sap_weekday(date_raw)
+            if weekday is None:
+                raise RuntimeError(f"Invalid date: {date_raw}")
+            
+            # Parse begin and end times
+            begin_time = sap_whole_minute_time(begin_raw)
+            end_time = sap_whole_minute_time(end_raw)
+            if begin_time is None or end_time is None:
+                continue
+            
+            weekday_and_time = (weekday, begin_time, end_time)
+            # Weekly events repeat the same slot with the same rooms, keep the first located week
+            if weekday_and_time in rooms_by_time:
+                continue
+            
+            building = None
+            room_number = None
+            
+            for room in rooms:
+                room_id = room.get("Otjid", "")
+                room_name = room.get("Name", "")
                 
-                # Parse end time
-                end_match = re.fullmatch(r"PT(\d\d)H(\d\d)M00S", end_raw)
-                if not end_match:
+                # Match room format like "123-4567"
+                number = sap_room_number(room_name)
+                if number is None:
                     continue
-                end_time = f"{end_match.group(1)}:{end_match.group(2)}"
                 
-                weekday_and_time = (weekday, begin_time, end_time)
-                
-                # Process rooms
-                rooms = result.get("Rooms", {}).get("results", [])
-                
-                buildings = set()
-                room_numbers = set()
-                
-                for room in rooms:
-                    room_id = room.get("Otjid", "")
-                    room_name = room.get("Name", "")
-                    
-                    # Match room format like "123-4567"
-                    room_match = re.fullmatch(r"(\d\d\d)-(\d\d\d\d)", room_name)
-                    if room_match:
-                        building = self.get_building_name(year, semester, room_id)
-                        room_number = int(room_match.group(2))
-                        buildings.add(building)
-                        room_numbers.add(room_number)
-                
-                if len(buildings) == 1:
-                    building = buildings.pop()
-                    room_number = room_numbers.pop() if len(room_numbers) == 1 else 0
+                room_building = self.get_building_name(year, semester, room_id)
+                if building is None:
+                    building, room_number = room_building, number
+                elif room_building != building:
+                    # Events in more than one building have no single location, skip the remaining lookups
+                    break
+                elif number != room_number:
+                    room_number = 0
+            else:
+                if building is not None:
                     rooms_by_time[weekday_and_time] = (building, room_number)
-                    
-            return rooms_by_time
-            
-        except Exception as e:
-            if self.verbose:
-                print(f"❌ Failed to get room info for {event_schedule_id}: {e}")
-            return {}
+                
+        return rooms_by_time
     
-    def _sap_date_parse(self, date_str: str) -> datetime:
-        """Parse SAP date format /Date(timestamp)/"""
-        match = re.fullmatch(r"/Date\((\d+)\)/", date_str)
-        if not match:
-            raise RuntimeError(f"Invalid date: {date_str}")
-        return datetime.fromtimestamp(int(match.group(1)) / 1000, timezone.utc)
-
     # ...existing code...
 def main():
     parser = argparse.ArgumentParser(description="Technion Course Fetcher with Full Schedule Support")
@@ -818,6 +1316,7 @@ def main():
     parser.add_argument("--save-firestore", action="store_true", help="Save to Firestore")
     parser.add_argument("--list-semesters", action="store_true", help="List available semesters")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+    parser.add_argument("--workers", type=int, default=8, help="Number of concurrent course requests")
     
     args = parser.parse_args()
     
@@ -825,14 +1324,15 @@ def main():
     fetcher = TechnionCourseFetcher(
         cache_dir=args.cache_dir,
         firestore_config=args.firestore_config,
-        verbose=args.verbose
+        verbose=args.verbose,
+        max_workers=args.workers
     )
     
     if args.list_semesters:
         print("📅 Available semesters:")
         semesters = fetcher.get_semesters()
         for sem in semesters[:10]:  # Show last 10 semesters
-            semester_name = {200: "Winter", 201: "Spring", 202: "Summer"}[sem["semester"]]
+            semester_name = SEMESTER_NAMES[sem["semester"]]
             print(f"  {sem['year']}-{sem['semester']} ({semester_name} {sem['year']})")
         return
     